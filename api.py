@@ -1,36 +1,60 @@
 # api.py
 
+import copy
+import sys
 import types
 
+# 本身不可变的类型，get_data 可直接返回，无需构建快照
+_IMMUTABLE_TYPES = (int, float, bool, str, bytes, tuple, frozenset, type(None))
+
+# 快照递归中的叶子节点按精确类型判断，一次哈希查找即可返回
+_LEAF_TYPES = frozenset(_IMMUTABLE_TYPES)
+
+# 受保护的键值集合，所有 Omni 实例共享，查找速度 O(1)
+_PROTECTED_KEYS = frozenset({"version", "admin", "config"})
+
+# 缺省值哨兵，用于区分“键不存在”与“值为 None”
+_MISSING = object()
+
 class Omni:
     """
     内核暴露给插件的唯一操作接口(沙箱层/Facade模式)
     """
     
+    # 固定属性布局：省去每个实例的 __dict__，也阻止插件给 API 挂载新属性
+    __slots__ = ("_kernel", "_plugin_name", "_log_prefix")
+    
     def __init__(self, kernel, plugin_name):
         # 使用单下划线表示受保护成员，虽不能完全防止恶意访问，
         # 但符合 Python 约定。不要使用双下划线，那只是混淆名称，不是真正的私有。
         self._kernel = kernel
         self._plugin_name = plugin_name
-        
-        # 定义受保护的键值集合，查找速度 O(1)
-        self._protected_keys = {"version", "admin", "config"}
+        self._log_prefix = f"[{plugin_name}] "
         
     def log(self, message):
         """带插件名的日志"""
-        print(f"[{self._plugin_name}] {message}")
+        # 单次 write 代替 print，避免其参数处理与分隔符拼接
+        sys.stdout.write(f"{self._log_prefix}{message}\n")
         
     def synapse(self, event_name, callback):
         """注册事件监听,代理给内核"""
         if not callable(callback):
             self.log(f"Error: event {event_name} callback is not callable")
             return
-        self._kernel.synapse(event_name, callback)
+        self._kernel.synapse(event_name, callback, owner=self._plugin_name)
 
     def on(self, event_name, callback):
         """提供别名以符合常见习惯"""
         return self.synapse(event_name, callback)
         
+    def unsynapse(self, event_name, callback):
+        """注销事件监听,代理给内核"""
+        self._kernel.unsynapse(event_name, callback, owner=self._plugin_name)
+
+    def off(self, event_name, callback):
+        """提供别名以符合常见习惯"""
+        return self.unsynapse(event_name, callback)
+        
     def impulse(self, event_name, **kwargs):
         """发送事件"""
         self._kernel.impulse(event_name, **kwargs)
@@ -41,55 +65,91 @@ class Omni:
         
     # --- 新增的数据操作接口  ---
     
-    def _check_permission(self, key):
-        """内部权限检查方法"""
-        if key in self._protected_keys:
-            self.log(f"Security Alert: 拒绝访问/修改受保护的键 '{key}'")
-            return False
-        return True
+    def _deny(self, key):
+        """记录越权访问并拒绝 (慢路径)"""
+        self.log(f"Security Alert: 拒绝访问/修改受保护的键 '{key}'")
     
     def _to_immutable(self, data):
         """
         递归的将数据转换为不可变类型
         """
-        if isinstance(data, dict):
+        if type(data) in _LEAF_TYPES:
+            # 最常见的情况：字符串、数字等叶子节点
+            return data
+        elif isinstance(data, dict):
             # 将字典转换为只读视图，并递归处理其中的值
             # 注意：这里创建了一个新的字典结构来承载只读视图，属于“只读快照”策略
             return types.MappingProxyType({k: self._to_immutable(v) for k, v in data.items()})
         elif isinstance(data, list):
             # 将列表转换为元组 (不可变)
-            return tuple(self._to_immutable(v) for v in data)
+            return tuple([self._to_immutable(v) for v in data])
         else:
-            # 字符串、数字等本身就是不可变的，直接返回
+            # 叶子类型已在上方处理；其余对象 (set、自定义实例等) 原样返回，
+            # 仍可能是可变的
             return data
             
-    def get_data(self, key, default=None):
-        """安全读取全局上下文数据"""
-        if key not in self._kernel.context:
+    def get_data(self, key, default=None, mutable=False):
+        """
+        安全读取全局上下文数据
+        默认返回共享的只读快照；mutable=True 时返回一份独立的可修改深拷贝
+        """
+        raw_data = self._kernel.context.get(key, _MISSING)
+        if raw_data is _MISSING:
             return default
         
-        raw_data = self._kernel.context[key]
+        if mutable:
+            # 深拷贝开销较大，仅在插件明确需要修改副本时才付出
+            try:
+                return copy.deepcopy(raw_data)
+            except Exception:
+                self.log(f"Security Warning: Data '{key}' is unsafe to copy. Access denied.")
+                return default
+        
+        # 不可变数据无需快照，直接返回
+        if isinstance(raw_data, _IMMUTABLE_TYPES):
+            return raw_data
+        
+        # 只读快照在写入前保持有效，由 set_data / append_data 负责失效；
+        # 插件仍持有引用的数据可能在内核之外被修改，不使用缓存
+        cacheable = key not in self._kernel._shared_keys
+        snapshots = self._kernel._snapshots
+        if cacheable and key in snapshots:
+            return snapshots[key]
+        
         """
-        返回数据的深拷贝，防止插件直接修改全局数据
-        注意：深拷贝可能失败（例如包含无法复制的对象），
+        返回数据的只读快照，防止插件直接修改全局数据
+        注意：构建快照可能失败（例如包含无法处理的对象），
         此时返回默认值并记录安全警告日志。
         """
         try:
-            return self._to_immutable(raw_data)
+            snapshot = self._to_immutable(raw_data)
         except Exception:
             self.log(f"Security Warning: Data '{key}' is unsafe to copy. Access denied.")
             return default # 安全失败 (Fail Safe)
+        
+        if cacheable:
+            snapshots[key] = snapshot
+        return snapshot
 
     def set_data(self, key, value):
         """设置全局上下文数据"""
-        if not self._check_permission(key):
+        # 权限检查内联为一次哈希查找，仅越权时才进入 _deny 慢路径
+        if key in _PROTECTED_KEYS:
+            self._deny(key)
             return
         self._kernel.context[key] = value
+        self._kernel._snapshots.pop(key, None)
+        # 写入的是调用方的对象本身 (不复制)：可变容器仍在插件手中，不再缓存其快照
+        if isinstance(value, _IMMUTABLE_TYPES):
+            self._kernel._shared_keys.discard(key)
+        else:
+            self._kernel._shared_keys.add(key)
         
     def append_data(self, key, value):
         """向列表类型的数据追加内容"""
         # 追加数据前必须检查权限，防止恶意插件绕过 set_data 直接修改受保护数据
-        if not self._check_permission(key):
+        if key in _PROTECTED_KEYS:
+            self._deny(key)
             return
 
         target = self._kernel.context.get(key)
@@ -99,4 +159,9 @@ class Omni:
         elif isinstance(target, list):
             target.append(value)
         else:
-            self.log(f"Error: Key '{key}' 存在但不是列表，无法追加数据。")
\ No newline at end of file
+            self.log(f"Error: Key '{key}' 存在但不是列表，无法追加数据。")
+            return
+        
+        self._kernel._snapshots.pop(key, None)
+        if not isinstance(value, _IMMUTABLE_TYPES):
+            self._kernel._shared_keys.add(key)
\ No newline at end of file
@@ -1,23 +1,26 @@
 # interface.py
 
-from abc import ABC, abstractmethod
-
-class Neuron(ABC):
+class Neuron:
     """
     插件基类接口 (Protocol)
-    强制所有插件必须实现标准生命周期方法
+    强制所有插件必须实现标准生命周期方法:
+        start() -> None  插件启动时的入口
+        stop()  -> None  插件停止/卸载时的清理逻辑
     """
-    
+
+    # 子类未声明 __slots__ 时仍会拥有 __dict__，插件可照常添加属性
+    __slots__ = ("api",)
+
+    # 生命周期契约，在子类定义时 (而非每次实例化时) 检查
+    _LIFECYCLE = ("start", "stop")
+
+    # 未实现全部生命周期方法的类视为抽象类 (如插件共用的中间基类)，内核拒绝启动
+    _abstract = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._abstract = not all(callable(getattr(cls, m, None)) for m in cls._LIFECYCLE)
+
     def __init__(self, api):
         # 接收内核注入的 API 实例
         self.api = api
-        
-    @abstractmethod
-    def start(self) -> None:
-        """插件启动时的入口"""
-        pass
-    
-    @abstractmethod
-    def stop(self) -> None:
-        """插件停止/卸载时的清理逻辑"""
-        pass
\ No newline at end of file
@@ -3,17 +3,28 @@
 import os
 import importlib
 import importlib.util
-import traceback
 import sys
-import json
+import types
 
 from interface import Neuron
 from api import Omni
 
+# 扫描时直接跳过的条目：__pycache__、__init__.py、隐藏文件、编辑器临时文件等
+_SKIP_PREFIXES = ("_", ".")
+_SKIP_NAMES = frozenset({"setup.py"})
+
 class MicroKernel:
     
+    _PY_EXT = ".py"  # 单文件插件的后缀
+    
+    # 预先绑定 API 与插件基类，_bootstrap 中以属性访问代替模块全局查找
+    _api_cls = Omni
+    _plugin_base = Neuron
+    
     def __init__(self):
         self.PLUGIN_DIR = "plugins"
+        # 调试模式下打印完整堆栈；生产环境可设 KERNEL_DEBUG=0 省去格式化开销
+        self.debug = os.environ.get("KERNEL_DEBUG", "1") == "1"
         # 全局上下文数据
         self.context = {
             "version": "1.0",
@@ -23,53 +34,122 @@ class MicroKernel:
         self.loaded_plugins = {} # {name: instance}
         self.loaded_modules = {} # {name: module}
         self.plugin_paths = {}   # {name: path}
-        self._events = {}        # 事件总线
+        self._apis = {}          # {name: Omni} 插件 API 实例缓存
+        self._events = {}        # 事件总线 {event: {(owner, key): callback}}
+        self._dispatch = {}      # {event: (callback, ...)} 分发元组缓存
+        self._owner_listeners = {}  # {plugin_name: {(event, key): None}}
+        self._snapshots = {}     # {key: 只读快照} get_data 的快照缓存
+        self._shared_keys = set() # 值仍可能被插件引用的键，不缓存其快照
         
         if not os.path.exists(self.PLUGIN_DIR):
             os.makedirs(self.PLUGIN_DIR)
             print(f"[*] Created plugin directory: {self.PLUGIN_DIR}")
             
-    def synapse(self, event_name: str, callback_func):
-        """Register an event listener"""
-        if event_name not in self._events:
-            self._events[event_name] = []
-        self._events[event_name].append(callback_func)
+    def synapse(self, event_name: str, callback_func, owner=None):
+        """Register an event listener (owner: 注册方插件名，卸载时据此清理)"""
+        # {(owner, key): callback} 充当有序集合，增删均为 O(1)
+        # 键中带上注册方：不同插件注册同一个回调时互不影响
+        key = (owner, self._listener_key(callback_func))
+        self._events.setdefault(event_name, {})[key] = callback_func
+        self._dispatch.pop(event_name, None)
+        
+        if owner is not None:
+            # 反向索引：卸载插件时只需访问它注册过的事件
+            self._owner_listeners.setdefault(owner, {})[(event_name, key)] = None
+        
+    def unsynapse(self, event_name: str, callback_func, owner=None):
+        """Remove an event listener registered by owner"""
+        self._discard_listener(event_name, (owner, self._listener_key(callback_func)))
+            
+    def _discard_listener(self, event_name, key):
+        """Remove one listener entry and invalidate the event's dispatch tuple"""
+        listeners = self._events.get(event_name)
+        if listeners is not None and key in listeners:
+            del listeners[key]
+            self._dispatch.pop(event_name, None)
+        # 按键中记录的实际注册方清理索引，而非调用方声称的 owner
+        owned = self._owner_listeners.get(key[0])
+        if owned:
+            owned.pop((event_name, key), None)
+            
+    def _drop_listeners(self, owner):
+        """Remove every listener registered by the given plugin"""
+        for event_name, key in self._owner_listeners.pop(owner, ()):
+            self._discard_listener(event_name, key)
+            
+    @staticmethod
+    def _listener_key(callback_func):
+        """
+        按身份而非哈希生成监听键，回调本身无需可哈希
+        (定义了 __eq__ 而未定义 __hash__ 的类，其绑定方法同样可以注册)
+        """
+        if isinstance(callback_func, types.MethodType):
+            # 每次取属性都会生成新的绑定方法对象，按 (实例, 函数) 识别同一监听
+            return id(callback_func.__self__), id(callback_func.__func__)
+        return id(callback_func)
         
     def impulse(self, event_name:str, **kwargs):
         """Broadcast an event to all listeners"""
-        if event_name in self._events:
-            listeners = self._events[event_name][:] 
-            for func in listeners: 
-                try:
+        # 不可变的分发元组只在监听变动时重建，广播时无需逐次复制
+        # (同时充当快照：回调中增删监听不影响本轮广播)
+        snapshot = self._dispatch.get(event_name)
+        if snapshot is None:
+            listeners = self._events.get(event_name)
+            if not listeners:
+                return
+            snapshot = self._dispatch[event_name] = tuple(listeners.values())
+        for func in snapshot:
+            try:
+                if kwargs:
                     func(**kwargs)
-                except Exception as e:
-                    print(f"[!] Event error ({event_name}): {e}")
-                    traceback.print_exc()
+                else:
+                    # 无参数事件：直接调用，省去空字典解包
+                    func()
+            except Exception as e:
+                print(f"[!] Event error ({event_name}): {e}")
+                if self.debug:
+                    self._print_traceback()
+                        
+    @staticmethod
+    def _print_traceback():
+        """打印当前异常的堆栈；traceback 仅在首次出错时才导入"""
+        import traceback
+        traceback.print_exc()
                         
     # --- Loader Mechanism --- #
     
     def _bootstrap(self, mod, name):
         """Check if the module has a Plugin class and start it"""
-        if hasattr(mod, "Plugin"):
-            try:
-                # 1. Create API instance
-                plugin_api = Omni(self, name)
-                # 2. Instantiate the plugin
-                plugin_instance = mod.Plugin(plugin_api)
-                
-                # 3. Check type inheritance
-                if not isinstance(plugin_instance, Neuron):
-                    print(f"[!] Error: {name} does not inherit from Neuron (Plugin Interface).")
-                    return
-                    
-                self.loaded_plugins[name] = plugin_instance
-                plugin_instance.start()
-                print(f"[+] {name} is ready")
-            except Exception as e:
-                print(f"[!] '{name}' failed to bootstrap: {e}")
-                traceback.print_exc()
-        else:
+        plugin_cls = getattr(mod, "Plugin", None)
+        if plugin_cls is None:
             print(f"[*] Module '{name}' has no 'Plugin' class, skipping.")
+            return
+        
+        # 1. Check type inheritance (在类上检查一次，不合规的插件不会被实例化)
+        if not (isinstance(plugin_cls, type) and issubclass(plugin_cls, self._plugin_base)):
+            print(f"[!] Error: {name} does not inherit from Neuron (Plugin Interface).")
+            return
+        
+        # 未实现 start()/stop() 的抽象类不能启动 (对应 ABC 在实例化时的检查)
+        if plugin_cls._abstract:
+            print(f"[!] Error: {name} does not implement start() and stop().")
+            return
+        
+        try:
+            # 2. Create API instance (无状态，按插件名复用，重载时无需重建)
+            plugin_api = self._apis.get(name)
+            if plugin_api is None:
+                plugin_api = self._apis[name] = self._api_cls(self, name)
+            # 3. Instantiate the plugin
+            plugin_instance = plugin_cls(plugin_api)
+                
+            self.loaded_plugins[name] = plugin_instance
+            plugin_instance.start()
+            print(f"[+] {name} is ready")
+        except Exception as e:
+            print(f"[!] '{name}' failed to bootstrap: {e}")
+            if self.debug:
+                self._print_traceback()
             
     def _action_loader(self, filename, name, path):
         """Dynamically load a plugin module from file"""
@@ -89,7 +169,8 @@ class MicroKernel:
             self._bootstrap(mod, name)
         except Exception as e:
             print(f"[-] Failed to load {filename}: {e}")
-            traceback.print_exc()
+            if self.debug:
+                self._print_traceback()
             
     # --- Public Methods --- #
 
@@ -97,35 +178,47 @@ class MicroKernel:
         """Initialize all plugins in the plugin directory"""
         print(f"[*] Scanning {self.PLUGIN_DIR}...")
         
-        if not os.path.exists(self.PLUGIN_DIR):
+        # os.scandir 的 DirEntry 自带文件类型信息，免去逐项 join + stat
+        try:
+            entries = list(os.scandir(self.PLUGIN_DIR))
+        except FileNotFoundError:
             print(f"[!] Plugin directory '{self.PLUGIN_DIR}' does not exist.")
             return
         
-        for item in os.listdir(self.PLUGIN_DIR):
-            full_path = os.path.join(self.PLUGIN_DIR, item)
+        for entry in entries:
+            item = entry.name
+            if item.startswith(_SKIP_PREFIXES) or item in _SKIP_NAMES:
+                continue
             
-            # 1. 仅处理文件，跳过目录
-            if os.path.isfile(full_path) and item.endswith(".py"):
-                name = os.path.splitext(item)[0]
-                self._action_loader(item, name, full_path)
+            # 1. 单文件插件
+            if item.endswith(self._PY_EXT) and entry.is_file():
+                # 后缀已确认，直接切片得到插件名
+                self._action_loader(item, item[:-len(self._PY_EXT)], entry.path)
                 
             # 2. 支持子目录中的插件
-            elif os.path.isdir(full_path):
+            elif entry.is_dir():
                 # 检查目录下是否存在__init__.py
-                init_path = os.path.join(full_path, "__init__.py")
-                if os.path.exists(init_path):
+                init_path = os.path.join(entry.path, "__init__.py")
+                if os.path.isfile(init_path):
                     # 将目录名作为插件名
                     self._action_loader(item, item, init_path)
-                else:
-                    pass
                 
+    def _strip_ext(self, filename):
+        """去除 .py 后缀 (若存在) 得到插件名"""
+        if filename.endswith(self._PY_EXT):
+            return filename[:-len(self._PY_EXT)]
+        return filename
+        
     def load_plugin(self, filename):
-        if not filename.endswith(".py"):
-            filename += ".py"
-        name = os.path.splitext(filename)[0]
+        # 注意：扫描时的 _SKIP_PREFIXES / _SKIP_NAMES 过滤不作用于此处，
+        # 显式指定的 "_foo" 等插件仍会被加载
+        name = self._strip_ext(filename)
+        filename = name + self._PY_EXT
         path = os.path.join(self.PLUGIN_DIR, filename)
         
-        if not os.path.exists(path):
+        # isfile 单次 stat 同时确认存在性与文件类型，任何 OSError 都视为不存在
+        # (不跨调用缓存，插件文件可能随时变动)
+        if not os.path.isfile(path):
             print(f"[!] File not found: {path}")
             return
         
@@ -137,24 +230,47 @@ class MicroKernel:
         
     def stop_plugin(self, name):
         """Stop and unload a plugin by name"""
-        if name in self.loaded_plugins:
+        plugin = self.loaded_plugins.pop(name, None)
+        if plugin is None:
+            print(f"[!] Plugin {name} is not running.")
+            return
+        
+        try:
+            plugin.stop()
+        except Exception as e:
+            print(f"[!] Error stopping {name}: {e}")
+        
+        # 已停止的插件不再接收事件，事件总线也不再引用它的实例
+        self._drop_listeners(name)
+        
+        # 清理 sys.modules
+        sys.modules.pop(name, None)
+            
+        print(f"[-] Plugin '{name}' stopped and unloaded.")
+            
+    def shutdown(self):
+        """Stop all plugins, then unload their modules in one sweep"""
+        names = tuple(self.loaded_plugins)
+        for name in names:
+            plugin = self.loaded_plugins[name]
             try:
-                self.loaded_plugins[name].stop()
+                plugin.stop()
             except Exception as e:
                 print(f"[!] Error stopping {name}: {e}")
-            
-            del self.loaded_plugins[name]
-            
-            # 清理 sys.modules
-            if name in sys.modules:
-                del sys.modules[name]
-                
+            self._drop_listeners(name)
             print(f"[-] Plugin '{name}' stopped and unloaded.")
-        else:
-            print(f"[!] Plugin {name} is not running.")
+        
+        # 统一清理，无论各插件的 stop() 是否抛出异常
+        modules = sys.modules
+        for name in names:
+            self.loaded_plugins.pop(name, None)
+            modules.pop(name, None)
             
     def reload_plugin(self, name):
         """Reload a plugin by name"""
+        # 允许传入文件名，自动去除 .py 后缀
+        name = self._strip_ext(name)
+        
         # 1. 获取路径
         path = self.plugin_paths.get(name)
         
@@ -176,6 +292,9 @@ class MicroKernel:
         return list(self.loaded_plugins.keys())
         
 if __name__ == "__main__":
+    # json 仅供 Shell 的 data 命令使用，作为模块导入内核时无需加载
+    import json
+
     kernel = MicroKernel()
     kernel.init_plugins()
     
@@ -192,9 +311,75 @@ if __name__ == "__main__":
         "cls": "\n[usage] cls / clear\n[describe] 清空终端屏幕。",
     }
 
+    # --- 命令处理函数 ---
+    # 每个处理函数接收参数列表；返回 True 表示退出 Shell
+
+    def _cmd_exit(args):
+        print("Shutting down...")
+        kernel.shutdown()
+        return True
+
+    def _cmd_help(args):
+        print("Available Commands:", ", ".join(CMD_MANUAL.keys()))
+        print("Try 'load --help' for specific info.")
+
+    def _cmd_cls(args):
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+    def _cmd_list(args):
+        print(f"Active Plugins: {kernel.list_plugins()}")
+
+    def _cmd_stop(args):
+        if args:
+            kernel.stop_plugin(args[0])
+        else:
+            print("Error: Missing argument. Try 'stop -h'")
+
+    def _cmd_reload(args):
+        if args:
+            kernel.reload_plugin(args[0])
+        else:
+            print("Error: Missing argument. Try 'reload -h'")
+
+    def _cmd_load(args):
+        if args:
+            kernel.load_plugin(args[0])
+        else:
+            print("Error: Missing filename. Try 'load -h'")
+
+    # 预先构造编码器，避免每次 data 命令都重新解析参数、创建 JSONEncoder
+    _data_encoder = json.JSONEncoder(indent=2, ensure_ascii=False, default=str).encode
+
+    def _cmd_data(args):
+        print(_data_encoder(kernel.context))
+
+    # 数据驱动的命令分发表 (与 CMD_MANUAL 对应)，O(1) 查找
+    CMD_HANDLERS = {
+        "exit": _cmd_exit,
+        "help": _cmd_help,
+        "?": _cmd_help,
+        "cls": _cmd_cls,
+        "clear": _cmd_cls,
+        "list": _cmd_list,
+        "stop": _cmd_stop,
+        "reload": _cmd_reload,
+        "load": _cmd_load,
+        "data": _cmd_data,
+    }
+
+    # 交互式终端启用行编辑与历史记录 (POSIX)；脚本/管道输入时不输出提示符
+    if sys.stdin.isatty():
+        try:
+            import readline  # noqa: F401
+        except ImportError:
+            pass
+        prompt = "kernel> "
+    else:
+        prompt = ""
+
     while True:
         try:
-            cmd_str = input("kernel> ").strip()
+            cmd_str = input(prompt).strip()
             if not cmd_str:
                 continue
             
@@ -213,50 +398,16 @@ if __name__ == "__main__":
             
             # --- 命令分发 ---
             
-            if cmd == "exit":
-                print("Shutting down...")
-                for name in list(kernel.loaded_plugins.keys()):
-                    kernel.stop_plugin(name)
-                break
-                
-            elif cmd in ["help", "?"]:
-                print("Available Commands:", ", ".join(CMD_MANUAL.keys()))
-                print("Try 'load --help' for specific info.")
-
-            elif cmd in ["cls", "clear"]:
-                os.system('cls' if os.name == 'nt' else 'clear')
-
-            elif cmd == "list":
-                print(f"Active Plugins: {kernel.list_plugins()}")
-                
-            elif cmd == "stop":
-                if args:
-                    kernel.stop_plugin(args[0])
-                else:
-                    print("Error: Missing argument. Try 'stop -h'")
-
-            elif cmd == "reload":
-                if args:
-                    target = args[0]
-                    # 自动去除 .py 后缀
-                    if target.endswith(".py"):
-                        target = target[:-3]
-                    kernel.reload_plugin(target)
-                else:
-                    print("Error: Missing argument. Try 'reload -h'")
-
-            elif cmd == "load":
-                if args:
-                    kernel.load_plugin(args[0])
-                else:
-                    print("Error: Missing filename. Try 'load -h'")
-            
-            elif cmd == "data":
-                print(json.dumps(kernel.context, indent=2, ensure_ascii=False, default=str))
-                
-            else:
+            handler = CMD_HANDLERS.get(cmd)
+            if handler is None:
                 print(f"Unknown command: '{cmd}'. Type 'help' for list.")
+            elif handler(args):
+                break
                 
+        except EOFError:
+            # 输入流结束 (如管道脚本执行完毕)，按 exit 处理
+            _cmd_exit(())
+            break
         except KeyboardInterrupt:
             print("\nForce Exiting...")
             break
@@ -15,13 +15,18 @@ class Plugin(Neuron):
         
         cfg_path = os.path.join(base_dir, 'config.json')
         config = {"db_name": "audit.db", "log_file": "audit.log"} # 默认值
+        # EAFP: 直接打开，省去 os.path.exists 的额外 stat 调用
         try:
-            if os.path.exists(cfg_path):
-                with open(cfg_path, 'r', encoding='utf-8') as f:
-                    file_config = json.load(f)
-                    config.update(file_config)
-        except Exception:
+            with open(cfg_path, 'rb') as f:
+                parsed = json.loads(f.read())
+            if isinstance(parsed, dict):
+                config.update(parsed)
+            else:
+                self.api.log("读取配置失败: config.json 顶层必须是对象")
+        except FileNotFoundError:
             pass
+        except (OSError, ValueError) as e:
+            self.api.log(f"读取配置失败: {e}")
 
         try:
             self.audit_service = AuditClient(config, env_secrets, base_dir)
@@ -1,6 +1,5 @@
 
 # plugins/secure_audit/src/utils.py
-import os
 import hashlib
 import hmac
 import datetime
@@ -9,10 +8,12 @@ class EnvLoader:
     @staticmethod
     def load(path):
         env_vars = {}
-        if not os.path.exists(path):
+        try:
+            f = open(path, 'r', encoding='utf-8')
+        except FileNotFoundError:
             return env_vars
         
-        with open(path, 'r', encoding='utf-8') as f:
+        with f:
             for line in f:
                 line = line.strip()
                 if not line or line.startswith('#'):